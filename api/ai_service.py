@@ -1,12 +1,19 @@
 import os
 import logging
 import re
-from typing import Dict, Any
-from dotenv import load_dotenv
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+# Load environment variables (API Keys) from .env; Vercel injects them directly
+if not os.environ.get('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Imported after .env is loaded: the parser reads MAX_EMAIL_LENGTH at import
 from gmail_parser import clean_email_text
 
-# Load environment variables (API Keys)
-load_dotenv()
 logger = logging.getLogger(__name__)
 
 # --- THE BRAIN'S RULEBOOK ---
@@ -48,6 +55,66 @@ Your task is to analyze emails and categorize them into exactly one of four cate
 - If unsure, default to READ.
 """
 
+# Available categories, in the order /categories lists them
+CATEGORY_ORDER = ("DELETE", "JOB", "READ", "IMPORTANT")
+
+# --- RULE-BASED FALLBACK KEYWORDS (checked in priority order) ---
+JOB_KEYWORDS = frozenset({'job', 'hiring', 'recruiter', 'application', 'interview', 'position', 'career', 'linkedin', 'indeed', 'ziprecruiter'})
+IMPORTANT_KEYWORDS = frozenset({'urgent', 'important', 'asap', 'otp', 'verification', 'password', 'security', 'account', 'billing', 'invoice', 'payment', 'due'})
+DELETE_KEYWORDS = frozenset({'sale', 'discount', 'offer', 'promotion', 'marketing', 'newsletter', 'spam', 'unsubscribe', 'advertisement'})
+
+# Keywords match at the start of a word, so plurals and other inflections
+# ("jobs", "invoices", "offers") still count but "residue" is not "due".
+# One compiled alternation per category, in priority order
+_CATEGORY_PATTERNS = [
+    (category, re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(keywords))) + ')'))
+    for category, keywords in (
+        ("JOB", JOB_KEYWORDS),
+        ("IMPORTANT", IMPORTANT_KEYWORDS),
+        ("DELETE", DELETE_KEYWORDS),
+    )
+]
+
+# Patterns for the categories that outrank each one (None: no subject hit)
+_OUTRANKING = {category: _CATEGORY_PATTERNS[:i] for i, (category, _) in enumerate(_CATEGORY_PATTERNS)}
+_OUTRANKING[None] = _CATEGORY_PATTERNS
+
+# [epoch second, ISO string] for the last timestamp handed out
+_TS_CACHE = [0, ""]
+
+def _match_category(text: str, patterns: list = _CATEGORY_PATTERNS) -> Optional[str]:
+    """Return the highest-priority category (JOB > IMPORTANT > DELETE) with a keyword in text."""
+    content = text.lower()
+    for category, pattern in patterns:
+        if pattern.search(content):
+            return category
+    return None
+
+def _classify(subject: str, body: str, snippet: str) -> str:
+    """Rule-based categorization of already-extracted email fields."""
+    # Scan the short subject first. A JOB hit there can't be outranked, so
+    # the (much longer) body and snippet are skipped; otherwise they are only
+    # checked for the categories that outrank the subject's hit
+    category = _match_category(subject)
+    higher = _OUTRANKING[category]
+    if not higher:
+        return category
+
+    body_category = _match_category(" ".join((body, snippet)), higher)
+
+    # Default to READ
+    return body_category or category or "READ"
+
+# Emails up to this many characters (subject + body + snippet) are memoized.
+# lru_cache bounds entries, not bytes, and the keys are the fields themselves,
+# so oversized ones (e.g. a raw snippet standing in for the body) skip it
+_CLASSIFY_CACHE_MAX_INPUT = 2 * int(os.getenv('MAX_EMAIL_LENGTH', '10000'))
+
+@lru_cache(maxsize=4096)
+def _classify_cached(subject: str, body: str, snippet: str) -> str:
+    """Memoized _classify() for emails within the size bound."""
+    return _classify(subject, body, snippet)
+
 class AIService:
     def __init__(self):
         logger.info("AI service initialized (rule-based fallback)")
@@ -58,46 +125,35 @@ class AIService:
         Categorize email based on parsed content from GmailParser using simple rules.
         """
         # Extract content from parsed data
-        subject = parsed_content.get('subject', '').lower()
-        body = parsed_content.get('body', '').lower()
-        snippet = parsed_content.get('snippet', '').lower()
-
-        # Combine all content for analysis
-        content = f"{subject} {body} {snippet}"
+        subject = parsed_content.get('subject', '')
+        body = parsed_content.get('body', '')
+        snippet = parsed_content.get('snippet', '')
 
         # Simple rule-based categorization (fallback)
-        logger.info(f"Categorizing email with subject: {subject[:50]}...")
-
-        # JOB category (highest priority)
-        job_keywords = ['job', 'hiring', 'recruiter', 'application', 'interview', 'position', 'career', 'linkedin', 'indeed', 'ziprecruiter']
-        if any(keyword in content for keyword in job_keywords):
-            logger.info("Categorized as JOB")
-            return "JOB"
-
-        # IMPORTANT category
-        important_keywords = ['urgent', 'important', 'asap', 'otp', 'verification', 'password', 'security', 'account', 'billing', 'invoice', 'payment', 'due']
-        if any(keyword in content for keyword in important_keywords):
-            logger.info("Categorized as IMPORTANT")
-            return "IMPORTANT"
-
-        # DELETE category
-        delete_keywords = ['sale', 'discount', 'offer', 'promotion', 'marketing', 'newsletter', 'spam', 'unsubscribe', 'advertisement']
-        if any(keyword in content for keyword in delete_keywords):
-            logger.info("Categorized as DELETE")
-            return "DELETE"
-
-        # Default to READ
-        logger.info("Categorized as READ (default)")
-        return "READ"
+        logger.info(f"Categorizing email with subject: {subject[:50].lower()}...")
+
+        if len(subject) + len(body) + len(snippet) > _CLASSIFY_CACHE_MAX_INPUT:
+            category = _classify(subject, body, snippet)
+        else:
+            category = _classify_cached(subject, body, snippet)
+        logger.info(f"Categorized as {category}")
+        return category
+
+    def clear_cache(self) -> None:
+        """Clear the memoized rule-based categorization results."""
+        _classify_cached.cache_clear()
 
     def get_available_categories(self) -> list:
         """Get list of available email categories."""
-        return ["DELETE", "JOB", "READ", "IMPORTANT"]
+        return list(CATEGORY_ORDER)
 
     def get_timestamp(self) -> str:
-        """Get current timestamp."""
-        from datetime import datetime
-        return datetime.utcnow().isoformat()
+        """Get current UTC timestamp (second resolution, formatted once per second)."""
+        now = int(time.time())
+        if now != _TS_CACHE[0]:
+            _TS_CACHE[0] = now
+            _TS_CACHE[1] = datetime.utcfromtimestamp(now).isoformat()
+        return _TS_CACHE[1]
 
     def get_stats(self) -> Dict[str, Any]:
         """Get categorization statistics."""
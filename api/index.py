@@ -1,93 +1,77 @@
 import os
 import sys
-import json
 import logging
 
-print("🐍 Starting Python serverless function...")
-print(f"📂 Current working directory: {os.getcwd()}")
-print(f"📂 Python path: {sys.path}")
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Add the api directory to Python path so we can import services
 api_dir = os.path.dirname(os.path.abspath(__file__))
 if api_dir not in sys.path:
     sys.path.insert(0, api_dir)
-    print(f"📂 Added to Python path: {api_dir}")
-
-try:
-    from flask import Flask, request, jsonify
-    print("✅ Flask imported successfully")
-except ImportError as e:
-    print(f"❌ Failed to import Flask: {e}")
 
-try:
-    from flask_cors import CORS
-    print("✅ Flask-CORS imported successfully")
-except ImportError as e:
-    print(f"❌ Failed to import Flask-CORS: {e}")
-
-try:
-    from ai_service import AIService
-    print("✅ AI service imported successfully")
-except ImportError as e:
-    print(f"❌ Failed to import AI service: {e}")
-    import traceback
-    print(f"❌ Import traceback: {traceback.format_exc()}")
-
-try:
-    from gmail_parser import GmailParser
-    print("✅ Gmail parser imported successfully")
-except ImportError as e:
-    print(f"❌ Failed to import Gmail parser: {e}")
-    import traceback
-    print(f"❌ Import traceback: {traceback.format_exc()}")
+import orjson
+from flask import Flask, request
+from flask_cors import CORS
+from ai_service import AIService, CATEGORY_ORDER
+from gmail_parser import GmailParser
+from utils.json_response import json_response, raw_json_response
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for extension requests
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Routes serialize with orjson (utils.json_response); these only keep Flask's
+# own JSON provider compact and unsorted, should anything fall back to it
+app.json.sort_keys = False
+app.json.compact = True
 
 # Initialize services
-print("🔧 Initializing AI service...")
 try:
     ai_service = AIService()
-    print("✅ AI service initialized")
 except Exception as e:
-    print(f"❌ Failed to initialize AI service: {e}")
+    logger.error(f'Failed to initialize AI service: {str(e)}')
     ai_service = None
 
-print("🔧 Initializing Gmail parser...")
 try:
     gmail_parser = GmailParser()
-    print("✅ Gmail parser initialized")
 except Exception as e:
-    print(f"❌ Failed to initialize Gmail parser: {e}")
+    logger.error(f'Failed to initialize Gmail parser: {str(e)}')
     gmail_parser = None
 
+logger.info('services initialized')
+
+# Upper bound on emails accepted by /categorize/batch
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 50))
+
+# Static payloads are serialized once at import instead of per request
+_ROOT_BODY = orjson.dumps({
+    'message': 'Email AI Categorizer API',
+    'status': 'running',
+    'endpoints': {
+        'health': '/health',
+        'categorize': '/categorize (POST)',
+        'categories': '/categories'
+    }
+})
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'email-ai-categorizer-backend'
+})
+_CATEGORIES_BODY = orjson.dumps({
+    'categories': list(CATEGORY_ORDER)
+})
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint."""
-    print("🏠 Root endpoint called")
-    return jsonify({
-        'message': 'Email AI Categorizer API',
-        'status': 'running',
-        'endpoints': {
-            'health': '/health',
-            'categorize': '/categorize (POST)',
-            'categories': '/categories'
-        }
-    })
+    return raw_json_response(_ROOT_BODY)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    print("🏥 Health check called")
-    return jsonify({
-        'status': 'healthy',
-        'service': 'email-ai-categorizer-backend'
-    })
+    return raw_json_response(_HEALTH_BODY)
 
 @app.route('/categorize', methods=['POST'])
 def categorize_email():
@@ -102,22 +86,20 @@ def categorize_email():
         "snippet": "Email preview snippet (optional)"
     }
     """
-    print("📧 Categorize endpoint called")
     try:
-        print("📨 Getting JSON data...")
-        data = request.get_json()
-        print(f"📨 Received data: {data}")
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, status=400)
 
         if not data:
-            print("❌ No data provided")
-            return jsonify({'error': 'No data provided'}), 400
+            return json_response({'error': 'No data provided'}, status=400)
 
         # Validate required fields
         required_fields = ['subject', 'sender']
         for field in required_fields:
             if field not in data:
-                print(f"❌ Missing required field: {field}")
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+                return json_response({'error': f'Missing required field: {field}'}, status=400)
 
         # Extract email content
         subject = data.get('subject', '')
@@ -125,64 +107,107 @@ def categorize_email():
         body = data.get('body', '')
         snippet = data.get('snippet', '')
 
-        print(f"📧 Processing email: {subject} from {sender}")
-
         # Parse and clean email content
-        print("🔍 Parsing email content...")
         parsed_content = gmail_parser.parse_email(subject, sender, body, snippet)
 
         # Get category from AI service
-        print("🤖 Getting category from AI service...")
         category = ai_service.categorize_email(parsed_content)
 
-        print(f"✅ Categorized email as: {category}")
-
         logger.info(f'Categorized email "{subject}" as "{category}"')
 
-        return jsonify({
+        return json_response({
             'category': category,
             'confidence': 0.85,  # Placeholder confidence score
             'processed_at': ai_service.get_timestamp()
         })
 
     except Exception as e:
-        print(f"❌ Error in categorize_email: {str(e)}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
-        logger.error(f'Error categorizing email: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.exception(f'Error categorizing email: {str(e)}')
+        return json_response({'error': 'Internal server error'}, status=500)
 
-@app.route('/categories', methods=['GET'])
-def get_categories():
-    """Get available email categories."""
+@app.route('/categorize/batch', methods=['POST'])
+def categorize_email_batch():
+    """
+    Categorize several emails in one request.
+
+    Expected JSON payload:
+    {
+        "emails": [
+            {"subject": "...", "sender": "...", "body": "...", "snippet": "..."},
+            ...
+        ]
+    }
+
+    Results are returned in the same order as the input emails.
+    """
     try:
-        categories = ai_service.get_available_categories()
-        return jsonify({
-            'categories': categories
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, status=400)
+
+        emails = data.get('emails') if isinstance(data, dict) else None
+        if not isinstance(emails, list) or not emails:
+            return json_response({'error': 'Expected a non-empty "emails" list'}, status=400)
+
+        if len(emails) > MAX_BATCH_SIZE:
+            return json_response({'error': f'Batch too large (max {MAX_BATCH_SIZE} emails)'}, status=400)
+
+        # Validate every email before doing any work
+        required_fields = ['subject', 'sender']
+        for index, email in enumerate(emails):
+            if not isinstance(email, dict):
+                return json_response({'error': f'Email {index} must be an object'}, status=400)
+            for field in required_fields:
+                if field not in email:
+                    return json_response({'error': f'Missing required field: {field} (email {index})'}, status=400)
+
+        results = []
+        for email in emails:
+            parsed_content = gmail_parser.parse_email(
+                email.get('subject', ''),
+                email.get('sender', ''),
+                email.get('body', ''),
+                email.get('snippet', '')
+            )
+            results.append({
+                'category': ai_service.categorize_email(parsed_content),
+                'confidence': 0.85  # Placeholder confidence score
+            })
+
+        logger.info(f'Categorized batch of {len(results)} emails')
+
+        return json_response({
+            'results': results,
+            'processed_at': ai_service.get_timestamp()
         })
+
     except Exception as e:
-        logger.error(f'Error getting categories: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.exception(f'Error categorizing email batch: {str(e)}')
+        return json_response({'error': 'Internal server error'}, status=500)
+
+@app.route('/categories', methods=['GET'])
+def get_categories():
+    """Get available email categories."""
+    return raw_json_response(_CATEGORIES_BODY)
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Get categorization statistics."""
     try:
         stats = ai_service.get_stats()
-        return jsonify(stats)
+        return json_response(stats)
     except Exception as e:
         logger.error(f'Error getting stats: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, status=500)
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return json_response({'error': 'Endpoint not found'}, status=404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return json_response({'error': 'Internal server error'}, status=500)
 
 # For Vercel deployment, just export the Flask app
 # Vercel automatically handles WSGI applications
-print("🚀 Starting Flask app for Vercel deployment...")
-print(f"📍 Available routes: {[rule.rule for rule in app.url_map.iter_rules()]}")
@@ -1 +0,0 @@
-# Services package
@@ -0,0 +1,18 @@
+"""
+JSON Response Helper
+Builds Flask responses serialized with orjson instead of jsonify.
+"""
+
+from typing import Any
+import orjson
+from flask import Response
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Serialize data with orjson and wrap it in a JSON Flask response."""
+    return raw_json_response(orjson.dumps(data), status=status)
+
+
+def raw_json_response(body: bytes, status: int = 200) -> Response:
+    """Wrap an already-serialized JSON body in a Flask response."""
+    return Response(body, status=status, mimetype='application/json')
@@ -1,42 +1,73 @@
 #!/usr/bin/env python3
 """
 Email AI Categorizer Backend Server
-Main Flask application for email categorization using AI.
+Main Quart (async Flask) application for email categorization using AI.
 """
 
 import os
+import asyncio
 import logging
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from dotenv import load_dotenv
-from services.ai_service import AIService
+import orjson
+from quart import Quart, request
+from quart_cors import cors
+from services.ai_service import AIService, CATEGORY_ORDER
 from services.gmail_parser import GmailParser
+from utils.json_response import json_response, raw_json_response
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env (Vercel injects them directly)
+if not os.environ.get('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app)  # Enable CORS for extension requests
+# Initialize Quart app
+app = Quart(__name__)
+app = cors(app)  # Enable CORS for extension requests
+
+# Routes serialize with orjson (utils.json_response); these only keep Quart's
+# own JSON provider compact and unsorted, should anything fall back to it
+app.json.sort_keys = False
+app.json.compact = True
 
 # Initialize services
 ai_service = AIService()
 gmail_parser = GmailParser()
 
+# Upper bound on emails accepted by /categorize/batch
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 50))
+
+# Maximum concurrent Gemini calls per batch request
+AI_CONCURRENCY = int(os.getenv('AI_CONCURRENCY', 8))
+
+# Bodies longer than this (in characters) are parsed in a worker thread so
+# BeautifulSoup doesn't stall every other in-flight request on the loop
+PARSE_IN_THREAD_THRESHOLD = int(os.getenv('PARSE_IN_THREAD_THRESHOLD', 20000))
+
+# Static payloads are serialized once at import instead of per request
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'email-ai-categorizer-backend'
+})
+_CATEGORIES_BODY = orjson.dumps({
+    'categories': list(CATEGORY_ORDER)
+})
+
+async def parse_email(subject, sender, body, snippet):
+    """Parse an email, offloading large bodies to a worker thread."""
+    if isinstance(body, str) and len(body) > PARSE_IN_THREAD_THRESHOLD:
+        return await asyncio.to_thread(gmail_parser.parse_email, subject, sender, body, snippet)
+    return gmail_parser.parse_email(subject, sender, body, snippet)
+
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'email-ai-categorizer-backend'
-    })
+    return raw_json_response(_HEALTH_BODY)
 
 @app.route('/categorize', methods=['POST'])
-def categorize_email():
+async def categorize_email():
     """
     Categorize an email based on its content.
 
@@ -49,16 +80,19 @@ def categorize_email():
     }
     """
     try:
-        data = request.get_json()
+        try:
+            data = orjson.loads(await request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, status=400)
 
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return json_response({'error': 'No data provided'}, status=400)
 
         # Validate required fields
         required_fields = ['subject', 'sender']
         for field in required_fields:
             if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+                return json_response({'error': f'Missing required field: {field}'}, status=400)
 
         # Extract email content
         subject = data.get('subject', '')
@@ -67,14 +101,15 @@ def categorize_email():
         snippet = data.get('snippet', '')
 
         # Parse and clean email content
-        parsed_content = gmail_parser.parse_email(subject, sender, body, snippet)
+        parsed_content = await parse_email(subject, sender, body, snippet)
 
-        # Get category from AI service
-        category = ai_service.categorize_email(parsed_content)
+        # Get category from AI service (awaits Gemini without blocking the loop)
+        result = await ai_service.categorize_email(parsed_content['subject'], parsed_content['body'])
+        category = result['category']
 
         logger.info(f'Categorized email "{subject}" as "{category}"')
 
-        return jsonify({
+        return json_response({
             'category': category,
             'confidence': 0.85,  # Placeholder confidence score
             'processed_at': ai_service.get_timestamp()
@@ -82,37 +117,113 @@ def categorize_email():
 
     except Exception as e:
         logger.error(f'Error categorizing email: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, status=500)
 
-@app.route('/categories', methods=['GET'])
-def get_categories():
-    """Get available email categories."""
+@app.route('/categorize/batch', methods=['POST'])
+async def categorize_email_batch():
+    """
+    Categorize several emails in one request.
+
+    Expected JSON payload:
+    {
+        "emails": [
+            {"subject": "...", "sender": "...", "body": "...", "snippet": "..."},
+            ...
+        ]
+    }
+
+    Gemini calls for the batch run concurrently (up to AI_CONCURRENCY at a
+    time); results are returned in the same order as the input emails.
+    """
     try:
-        categories = ai_service.get_available_categories()
-        return jsonify({
-            'categories': categories
+        try:
+            data = orjson.loads(await request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, status=400)
+
+        emails = data.get('emails') if isinstance(data, dict) else None
+        if not isinstance(emails, list) or not emails:
+            return json_response({'error': 'Expected a non-empty "emails" list'}, status=400)
+
+        if len(emails) > MAX_BATCH_SIZE:
+            return json_response({'error': f'Batch too large (max {MAX_BATCH_SIZE} emails)'}, status=400)
+
+        # Validate every email before doing any work
+        required_fields = ['subject', 'sender']
+        for index, email in enumerate(emails):
+            if not isinstance(email, dict):
+                return json_response({'error': f'Email {index} must be an object'}, status=400)
+            for field in required_fields:
+                if field not in email:
+                    return json_response({'error': f'Missing required field: {field} (email {index})'}, status=400)
+
+        # Parse and clean email content
+        parsed_contents = await asyncio.gather(*(
+            parse_email(
+                email.get('subject', ''),
+                email.get('sender', ''),
+                email.get('body', ''),
+                email.get('snippet', '')
+            )
+            for email in emails
+        ))
+
+        # Fan out to the AI service; latency is the slowest call, not the sum
+        semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+
+        async def categorize(parsed_content):
+            async with semaphore:
+                return await ai_service.categorize_email(parsed_content['subject'], parsed_content['body'])
+
+        # Identical emails in a batch would all miss the result cache at once,
+        # so each distinct (subject, body) gets a single call
+        pending = {}
+        for parsed_content in parsed_contents:
+            key = (parsed_content['subject'], parsed_content['body'])
+            if key not in pending:
+                pending[key] = categorize(parsed_content)
+        unique_results = dict(zip(pending, await asyncio.gather(*pending.values())))
+        results = [unique_results[(p['subject'], p['body'])] for p in parsed_contents]
+
+        logger.info(f'Categorized batch of {len(results)} emails')
+
+        return json_response({
+            'results': [
+                {
+                    'category': result['category'],
+                    'confidence': 0.85  # Placeholder confidence score
+                }
+                for result in results
+            ],
+            'processed_at': ai_service.get_timestamp()
         })
+
     except Exception as e:
-        logger.error(f'Error getting categories: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error(f'Error categorizing email batch: {str(e)}')
+        return json_response({'error': 'Internal server error'}, status=500)
+
+@app.route('/categories', methods=['GET'])
+async def get_categories():
+    """Get available email categories."""
+    return raw_json_response(_CATEGORIES_BODY)
 
 @app.route('/stats', methods=['GET'])
-def get_stats():
+async def get_stats():
     """Get categorization statistics."""
     try:
         stats = ai_service.get_stats()
-        return jsonify(stats)
+        return json_response(stats)
     except Exception as e:
         logger.error(f'Error getting stats: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, status=500)
 
 @app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+async def not_found(error):
+    return json_response({'error': 'Endpoint not found'}, status=404)
 
 @app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+async def internal_error(error):
+    return json_response({'error': 'Internal server error'}, status=500)
 
 if __name__ == '__main__':
     # Get configuration from environment
@@ -0,0 +1,10 @@
+"""
+ASGI entrypoint for running the backend under a production server.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+
+Each worker is a separate process with its own AIService (and result
+cache); within a worker the event loop overlaps in-flight Gemini calls.
+"""
+
+from app import app as application
@@ -3,39 +3,154 @@ Gmail Parser Service
 Handles parsing and cleaning of Gmail content for AI processing.
 """
 
+import os
 import re
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 import html
 
 logger = logging.getLogger(__name__)
 
+# Maximum cleaned body length handed to the AI service (read once at import)
+_MAX_EMAIL_LENGTH = int(os.getenv('MAX_EMAIL_LENGTH', '10000'))
+
+# Inputs up to this length are memoized. lru_cache bounds entries, not bytes,
+# and each key is the raw input, so longer ones are cleaned uncached
+_CLEAN_CACHE_MAX_INPUT = 2 * _MAX_EMAIL_LENGTH
+
+# Precompiled patterns shared by GmailParser and clean_email_text()
+_RE_ANGLE_EMAIL = re.compile(r'<([^>]+)>')
+_RE_ANGLE = re.compile(r'[<>]')
+_RE_MULTI_NL = re.compile(r'\n\s*\n')
+_RE_URGENT = re.compile(r'urgent|important|asap|emergency', re.IGNORECASE)
+_RE_MONEY = re.compile(r'\$[\d,]+|\b\d+\s*(?:dollars?|usd|eur|gbp)', re.IGNORECASE)
+_RE_DATE = re.compile(r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', re.IGNORECASE)
+
+def _collapse_spaces(text: str) -> str:
+    """Collapse runs of spaces/tabs to a single space using C-level str ops."""
+    if '\t' in text:
+        text = text.replace('\t', ' ')
+    # Each pass halves every run, so this loops log2(longest run) times
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return text
+
+_COMMON_DOMAINS = frozenset({'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com'})
+
+# Matched against already-lowercased content, as substrings
+_PROMO_WORDS = ('deal', 'offer', 'discount', 'sale', 'free', 'buy now', 'limited time')
+
+_REPLY_PREFIXES = ('re:', 'fw:', 'fwd:')
+
+def _reply_prefix_length(subject: str) -> int:
+    """Length of a leading Re:/Fw:/Fwd: prefix (any case), or 0 if there is none."""
+    head = subject[:4].lower()
+    for prefix in _REPLY_PREFIXES:
+        if head.startswith(prefix):
+            return len(prefix)
+    return 0
+
+def _normalize_subject(subject: str) -> str:
+    """Clean and normalize email subject (uncached)."""
+    if not subject:
+        return ''
+
+    # Remove common prefixes (whitespace after them goes with the split below)
+    subject = subject[_reply_prefix_length(subject):]
+
+    # Remove extra whitespace
+    subject = ' '.join(subject.split())
+
+    # Decode HTML entities
+    subject = html.unescape(subject)
+
+    return subject.strip()
+
+def _normalize_sender(sender: str) -> str:
+    """Clean and normalize sender email address (uncached)."""
+    if not sender:
+        return ''
+
+    # Extract email from "Name <email>" format
+    email_match = _RE_ANGLE_EMAIL.search(sender)
+    if email_match:
+        return email_match.group(1).strip().lower()
+
+    # Clean up email address
+    sender = sender.strip().lower()
+
+    # Remove any remaining angle brackets
+    sender = _RE_ANGLE.sub('', sender)
+
+    return sender
+
+# Headers repeat heavily across a mailbox (same senders, same threads), so the
+# cleaned forms are memoized for inputs within _CLEAN_CACHE_MAX_INPUT
+@lru_cache(maxsize=8192)
+def _clean_subject_cached(subject: str) -> str:
+    """Memoized _normalize_subject() for inputs within the size bound."""
+    return _normalize_subject(subject)
+
+@lru_cache(maxsize=8192)
+def _clean_sender_cached(sender: str) -> str:
+    """Memoized _normalize_sender() for inputs within the size bound."""
+    return _normalize_sender(sender)
+
+_SIG_PATTERNS = [
+    r'--\s*$',  # Simple signature separator
+    r'Best regards,.*',
+    r'Regards,.*',
+    r'Cheers,.*',
+    r'Thank you,.*',
+    r'Sent from.*',
+    r'Confidential.*',
+    r'This email.*',
+]
+
+# Compiled once at import. One pass per pattern: on typical bodies this is
+# faster than a fused alternation, whose every position tries each branch
+_SIG_RES = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in _SIG_PATTERNS]
+
+_PROMO_PATTERNS = [
+    r'unsubscribe.*',
+    r'click here to unsubscribe',
+    r'privacy policy.*',
+    r'terms of service.*',
+    r'© \d{4}.*',
+]
+
+_PROMO_RES = [re.compile(p) for p in _PROMO_PATTERNS]
+
+# Anything that looks like a start/end tag, comment or doctype
+_RE_HAS_TAG = re.compile(r'<[a-zA-Z/!]')
+
+# Skip <script>/<style> subtrees while parsing instead of decomposing them after
+_BODY_STRAINER = SoupStrainer(lambda name, attrs: name not in ('script', 'style'))
+
+def _has_markup(text: str) -> bool:
+    """Cheap check for whether text needs an HTML parser at all."""
+    return '<' in text and _RE_HAS_TAG.search(text) is not None
+
+def _html_to_text(markup: str) -> str:
+    """Extract the visible text from HTML using the C-based lxml parser."""
+    try:
+        return BeautifulSoup(markup, 'lxml', parse_only=_BODY_STRAINER).get_text()
+    except FeatureNotFound:
+        # lxml not installed: fall back to the pure-Python parser
+        soup = BeautifulSoup(markup, 'html.parser')
+        for script in soup(['script', 'style']):
+            script.decompose()
+        return soup.get_text()
+
 class GmailParser:
     """Service for parsing and cleaning Gmail content."""
 
     def __init__(self):
         """Initialize the Gmail parser."""
-        # Common email signatures and footers to remove
-        self.signature_patterns = [
-            r'--\s*$',  # Simple signature separator
-            r'Best regards,.*',
-            r'Regards,.*',
-            r'Cheers,.*',
-            r'Thank you,.*',
-            r'Sent from.*',
-            r'Confidential.*',
-            r'This email.*',
-        ]
-
-        # Patterns for promotional content
-        self.promotional_patterns = [
-            r'unsubscribe.*',
-            r'click here to unsubscribe',
-            r'privacy policy.*',
-            r'terms of service.*',
-            r'© \d{4}.*',
-        ]
+        # Patterns for promotional content (compiled once at import)
+        self._promotional_res = _PROMO_RES
 
     def parse_email(self, subject: str, sender: str, body: str = '', snippet: str = '') -> Dict[str, Any]:
         """
@@ -89,75 +204,20 @@ class GmailParser:
 
     def _clean_subject(self, subject: str) -> str:
         """Clean and normalize email subject."""
-        if not subject:
-            return ''
-
-        # Remove common prefixes
-        subject = re.sub(r'^(Re|Fwd|FW|RE|FWD):\s*', '', subject, flags=re.IGNORECASE)
-
-        # Remove extra whitespace
-        subject = ' '.join(subject.split())
-
-        # Decode HTML entities
-        subject = html.unescape(subject)
-
-        return subject.strip()
+        if isinstance(subject, str) and len(subject) > _CLEAN_CACHE_MAX_INPUT:
+            return _normalize_subject(subject)
+        return _clean_subject_cached(subject)
 
     def _clean_sender(self, sender: str) -> str:
         """Clean and normalize sender email address."""
-        if not sender:
-            return ''
-
-        # Extract email from "Name <email>" format
-        email_match = re.search(r'<([^>]+)>', sender)
-        if email_match:
-            return email_match.group(1).strip().lower()
-
-        # Clean up email address
-        sender = sender.strip().lower()
-
-        # Remove any remaining angle brackets
-        sender = re.sub(r'[<>]', '', sender)
-
-        return sender
+        if isinstance(sender, str) and len(sender) > _CLEAN_CACHE_MAX_INPUT:
+            return _normalize_sender(sender)
+        return _clean_sender_cached(sender)
 
     def _clean_body(self, body: str) -> str:
         """Clean email body content."""
-        if not body:
-            return ''
-
-        try:
-            # Try to parse as HTML
-            soup = BeautifulSoup(body, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(['script', 'style']):
-                script.decompose()
-
-            # Extract text
-            text = soup.get_text()
-
-        except:
-            # If HTML parsing fails, treat as plain text
-            text = body
-
-        # Decode HTML entities
-        text = html.unescape(text)
-
-        # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # Multiple newlines to double
-        text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces to single
-
-        # Remove common email signatures and footers
-        for pattern in self.signature_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
-
-        # Limit length to prevent token overflow
-        max_length = int(os.getenv('MAX_EMAIL_LENGTH', 10000))
-        if len(text) > max_length:
-            text = text[:max_length] + '...'
-
-        return text.strip()
+        # Same pipeline as clean_email_text(), so share its memoized result
+        return clean_email_text(body)
 
     def _extract_features(self, subject: str, sender: str, body: str) -> Dict[str, Any]:
         """Extract useful features from email content."""
@@ -165,41 +225,47 @@ class GmailParser:
 
         # Subject features
         features['subject_length'] = len(subject)
-        features['has_urgent'] = bool(re.search(r'urgent|important|asap|emergency', subject + body, re.IGNORECASE))
+        features['has_urgent'] = bool(_RE_URGENT.search(subject) or _RE_URGENT.search(body))
         features['has_question'] = '?' in subject or '?' in body
-        features['is_reply'] = subject.lower().startswith(('re:', 'fwd:', 'fw:'))
+        features['is_reply'] = _reply_prefix_length(subject) > 0
 
         # Sender features
         features['sender_domain'] = sender.split('@')[-1] if '@' in sender else ''
-        features['is_common_domain'] = features['sender_domain'] in [
-            'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com'
-        ]
+        features['is_common_domain'] = features['sender_domain'] in _COMMON_DOMAINS
 
         # Body features
         features['body_length'] = len(body)
-        features['has_links'] = bool(re.search(r'http[s]?://', body))
-        features['has_attachments'] = bool(re.search(r'attachment|attached', body, re.IGNORECASE))
+        # Fixed substrings: plain 'in' tests, same results as the old regexes
+        features['has_links'] = 'http://' in body or 'https://' in body
+        body_lower = body.lower()
+        features['has_attachments'] = 'attachment' in body_lower or 'attached' in body_lower
 
         # Content analysis
-        features['contains_money'] = bool(re.search(r'\$[\d,]+|\b\d+\s*(?:dollars?|usd|eur|gbp)', body, re.IGNORECASE))
-        features['contains_dates'] = bool(re.search(r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', body, re.IGNORECASE))
+        features['contains_money'] = bool(_RE_MONEY.search(body))
+        features['contains_dates'] = bool(_RE_DATE.search(body))
 
         return features
 
     def _is_promotional(self, subject: str, body: str) -> bool:
         """Determine if email appears to be promotional."""
-        content = (subject + ' ' + body).lower()
+        # Subject first: a hit there skips lowercasing and scanning the body
+        seen = set()
+        for text in (subject, body):
+            content = text.lower()
 
-        # Check for promotional patterns
-        for pattern in self.promotional_patterns:
-            if re.search(pattern, content):
-                return True
+            # Check for promotional patterns
+            for pattern in self._promotional_res:
+                if pattern.search(content):
+                    return True
 
-        # Check for common promotional words
-        promotional_words = ['deal', 'offer', 'discount', 'sale', 'free', 'buy now', 'limited time']
-        word_count = sum(1 for word in promotional_words if word in content)
+            # Check for common promotional words (two distinct ones are enough)
+            for word in _PROMO_WORDS:
+                if word not in seen and word in content:
+                    seen.add(word)
+                    if len(seen) >= 2:
+                        return True
 
-        return word_count >= 2
+        return False
 
     def _calculate_priority_score(self, features: Dict[str, Any]) -> float:
         """Calculate a priority score based on email features."""
@@ -227,3 +293,61 @@ class GmailParser:
 
         # Clamp score between 0 and 1
         return max(0.0, min(1.0, score))
+
+
+def _clean_email_text(text: str) -> str:
+    """Clean email text for AI processing (uncached)."""
+    if not text:
+        return ''
+
+    if not _has_markup(text):
+        # Plain text (e.g. a snippet): no parser needed
+        cleaned_text = text
+    else:
+        try:
+            # Try to parse as HTML and extract text
+            cleaned_text = _html_to_text(text)
+
+        except:
+            # If HTML parsing fails, treat as plain text
+            cleaned_text = text
+
+    # Decode HTML entities
+    cleaned_text = html.unescape(cleaned_text)
+
+    # Trim before the regex passes; at most max_length survives anyway, and
+    # the 2x headroom covers whitespace/signatures that get stripped below
+    if len(cleaned_text) > 2 * _MAX_EMAIL_LENGTH:
+        cleaned_text = cleaned_text[:2 * _MAX_EMAIL_LENGTH]
+
+    # Remove excessive whitespace
+    cleaned_text = _RE_MULTI_NL.sub('\n\n', cleaned_text)  # Multiple newlines to double
+    cleaned_text = _collapse_spaces(cleaned_text)  # Multiple spaces to single
+
+    # Remove common email signatures and footers
+    for pattern in _SIG_RES:
+        cleaned_text = pattern.sub('', cleaned_text)
+
+    # Limit length to prevent token overflow
+    max_length = _MAX_EMAIL_LENGTH
+    if len(cleaned_text) > max_length:
+        cleaned_text = cleaned_text[:max_length] + '...'
+
+    return cleaned_text.strip()
+
+@lru_cache(maxsize=2048)
+def _clean_email_text_cached(text: str) -> str:
+    """Memoized _clean_email_text() for inputs within the size bound."""
+    return _clean_email_text(text)
+
+# Standalone function for AI service (backward compatibility)
+def clean_email_text(text: str) -> str:
+    """
+    Clean email text for AI processing.
+    This is a standalone function that can be imported by ai_service.
+    Results for inputs up to _CLEAN_CACHE_MAX_INPUT characters are memoized,
+    since automated notifications and newsletters repeat the same bodies.
+    """
+    if isinstance(text, str) and len(text) > _CLEAN_CACHE_MAX_INPUT:
+        return _clean_email_text(text)
+    return _clean_email_text_cached(text)